@@ -4,10 +4,12 @@ Module to split modelling data into
 - One hold out dataset for the final model performance evaluation
 """
 import logging
+from typing import Tuple
 
 import hydra
+import numpy as np
+import pandas as pd
 import wandb
-from sklearn.model_selection import train_test_split
 
 from src.utils.artifacts import read_dataframe_artifact, log_dataframe
 from src.utils.models import set_seed
@@ -15,6 +17,18 @@ from src.utils.models import set_seed
 logger = logging.getLogger(__name__)
 
 
+def seeded_train_test_split(
+    df: pd.DataFrame, test_size: float, seed: int
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Randomly split a dataframe in a train and a test dataframe.
+    The split is reproducible for a given seed.
+    """
+    rng = np.random.default_rng(seed)
+    idx = rng.permutation(len(df))
+    cut = int(len(df) * (1 - test_size))
+    return df.take(idx[:cut], axis=0), df.take(idx[cut:], axis=0)
+
+
 @hydra.main(config_path="../../conf", config_name="config")
 def main(config):
     with wandb.init(
@@ -31,9 +45,10 @@ def main(config):
         df = read_dataframe_artifact(run, **config["artifacts"]["model_input"])
 
         logger.info('Split data in train/validate and test data.')
-        train_validate_df, test_df = train_test_split(
+        train_validate_df, test_df = seeded_train_test_split(
             df,
             test_size=config["evaluation"]["test_set_ratio"],
+            seed=seed,
         )
 
         logger.info('Log train/validate and test data.')
@@ -1,6 +1,7 @@
 """
 Module for doing drift detection
 """
+from pathlib import Path
 from tempfile import TemporaryDirectory
 import logging
 
@@ -13,26 +14,26 @@ from evidently.dashboard.tabs import DataDriftTab
 from evidently.model_profile.sections import DataDriftProfileSection
 from evidently.model_profile import Profile
 
-from src.utils.artifacts import read_dataframe_artifact, log_file
+from src.utils.artifacts import get_api, read_dataframe_artifact, log_file, log_text
+from src.utils.data import downcast_dtypes
 
 logger = logging.getLogger(__name__)
 
 
 def get_model_training_data(run, project_name, model_name, model_version) -> pd.DataFrame:
     """Get training data used to train a specific model"""
-    api = wandb.Api()
     try:
-        artifact = api.artifact(f"{project_name}/{model_name}:{model_version}")
+        artifact = get_api().artifact(f"{run.entity}/{project_name}/{model_name}:{model_version}")
     except wandb.errors.CommError as e:
         raise ValueError(f"Trained model version does not exist. From WANDB: {e}")
     training_run = artifact.logged_by()
-    training_data_artifact_name_and_version =  training_run.used_artifacts()[0]._artifact_name
+    training_data_artifact_name_and_version = training_run.used_artifacts()[0]._artifact_name
     training_data_artifact_name, training_data_artifact_version = (
         training_data_artifact_name_and_version.split(":")
     )
-    return read_dataframe_artifact(
+    return downcast_dtypes(read_dataframe_artifact(
         run, name=training_data_artifact_name, version=training_data_artifact_version
-    )
+    ))
 
 
 @hydra.main(config_path="../../conf", config_name="config")
@@ -53,22 +54,7 @@ def main(config):
     # Most likely implemented as a rolling window. In this case we are just getting
     # data from the last batch inference.
     logger.info("Load data used for inference.")
-    inference_data = read_dataframe_artifact(run=run, **config['artifacts']['model_input'])
-
-    logger.info("Create and log data drift report.")
-    data_drift_report = Dashboard(tabs=[DataDriftTab()])
-    data_drift_report.calculate(
-        reference_data=training_data,
-        current_data=inference_data
-    )
-    with TemporaryDirectory() as tmpdirname:
-        data_drift_report_file_name = tmpdirname + "data_drift_report.html"
-        data_drift_report.save(data_drift_report_file_name)
-        log_file(
-            run=run,
-            file_path=data_drift_report_file_name,
-            **config["artifacts"]["feature_drift_report"]
-        )
+    inference_data = downcast_dtypes(read_dataframe_artifact(run=run, **config['artifacts']['model_input']))
 
     logger.info("Create and log data drift profile.")
     data_drift_profile = Profile(sections=[DataDriftProfileSection()])
@@ -76,20 +62,32 @@ def main(config):
         reference_data=training_data,
         current_data=inference_data
     )
-    with TemporaryDirectory() as tmpdirname:
-        data_drift_profile_file_name = f'{tmpdirname}data_drift_profile.json'
-        with open(data_drift_profile_file_name, "w") as file:
-            file.write(data_drift_profile.json())
-        log_file(
-            run=run,
-            file_path=data_drift_profile_file_name,
-            **config["artifacts"]["feature_drift_profile"]
-        )
+    log_text(
+        run=run,
+        text=data_drift_profile.json(),
+        file_name="data_drift_profile.json",
+        **config["artifacts"]["feature_drift_profile"]
+    )
 
     # Get number of drifted features from analyzer
     n_drifted_features = data_drift_profile.analyzers_results[DataDriftAnalyzer].metrics.n_drifted_features
 
     if n_drifted_features > 0:
+        logger.info("Create and log data drift report.")
+        data_drift_report = Dashboard(tabs=[DataDriftTab()])
+        data_drift_report.calculate(
+            reference_data=training_data,
+            current_data=inference_data
+        )
+        with TemporaryDirectory() as tmpdirname:
+            data_drift_report_file_name = str(Path(tmpdirname) / "data_drift_report.html")
+            data_drift_report.save(data_drift_report_file_name)
+            log_file(
+                run=run,
+                file_path=data_drift_report_file_name,
+                **config["artifacts"]["feature_drift_report"]
+            )
+
         warning_text = (
             f"Feature drift detected for {n_drifted_features} features. "
             f"Check data drift report and profile in run:{run.get_url()}"
@@ -26,13 +26,17 @@ class RegressionEvaluation:
             raise ValueError("Length of y_true and y_pred must be the same.")
         self.y_true=y_true
         self.y_pred = y_pred
+        self._metrics = None
 
     def get_metrics(self) -> dict:
-        return {
-            "mse": mean_squared_error(self.y_true, self.y_pred),
-            "mape": mean_absolute_percentage_error(self.y_true, self.y_pred),
-            "mae": mean_absolute_error(self.y_true, self.y_pred),
-        }
+        """Get regression metrics. The metrics are only calculated on the first call."""
+        if self._metrics is None:
+            self._metrics = {
+                "mse": mean_squared_error(self.y_true, self.y_pred),
+                "mape": mean_absolute_percentage_error(self.y_true, self.y_pred),
+                "mae": mean_absolute_error(self.y_true, self.y_pred),
+            }
+        return dict(self._metrics)
 
     def plot_actual_vs_predictions(self, outpath: Path, log_scale=False) -> None:
         """Plot actual values vs. predictions
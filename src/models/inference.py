@@ -20,6 +20,7 @@ def main(config):
 
     logger.info("Load model.")
     loaded_model = get_model(
+        run.entity,
         config["main"]["project_name"],
         config['artifacts']['model']["name"],
         config['artifacts']['model']['version']
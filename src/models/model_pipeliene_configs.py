@@ -84,6 +84,7 @@ class RidgePipelineConfig(BasePipelineConfig):
                 {
                     "pip": [
                         "mlflow==1.23.1",
+                        "onnxruntime",
                     ],
                 },
             ],
@@ -138,6 +139,7 @@ class RandomForestPipelineConfig(BasePipelineConfig):
                 {
                     "pip": [
                         "mlflow==1.23.1",
+                        "onnxruntime",
                     ],
                 },
             ],
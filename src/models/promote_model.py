@@ -3,14 +3,16 @@ Script for promoting latest trained model to production if the performance on a
 - is better than a fixed threshold.
 - is better than the current production model.
 """
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 import hydra
+import numpy as np
 import wandb
 
-from src.models.evaluation import RegressionEvaluation
-from src.utils.artifacts import read_dataframe_artifact
-from src.utils.models import get_model
+from src.utils.artifacts import get_model_artifact, read_dataframe_artifact
+from src.utils.data import downcast_dtypes
+from src.utils.models import LoadedModel, get_model
 from src.exceptions import ArtifactDoesNoteExistError
 
 logger = logging.getLogger(__name__)
@@ -41,39 +43,26 @@ def log_promotion_status(model_version: str, additional_info: str, model_to_be_p
         )
 
 
-class SingleModelTest:
+def calc_mae(y_true: np.ndarray, y_pred: np.ndarray) -> float:
+    return float(np.abs(y_true - y_pred).mean())
 
-    def __init__(self, model, test_data, target_col, max_mae):
-        self.model = model
-        self.test_data = test_data
-        self.target_col = target_col
-        self.max_mae = max_mae
-        self.predictions = model.predict(test_data)
-        self.model_mae = self._calc_model_mae(self.predictions, test_data, target_col)
-
-    @staticmethod
-    def _calc_model_mae(predictions, test_data, target_col):
-        evaluation = RegressionEvaluation(
-            y_true=test_data[target_col],
-            y_pred=predictions
-        )
-        return evaluation.get_metrics()["mae"]
 
-    def _model_has_ok_mae(self) -> bool:
-        return self.model_mae < self.max_mae
+class SingleModelTest:
 
-    def _predictions_all_positive(self) -> bool:
-        return self.predictions.min() > 0
+    def __init__(self, model, test_data, y_true, max_mae):
+        self.max_mae = max_mae
+        self.predictions = np.ascontiguousarray(model.predict(test_data), dtype=np.float32)
+        self.model_mae = calc_mae(y_true=y_true, y_pred=self.predictions)
+        self._ok_mae = bool(self.model_mae < self.max_mae)
+        self._all_positive = bool(self.predictions.min() > 0)
 
     @property
     def model_passes_tests(self) -> bool:
-        return all([
-            self._model_has_ok_mae(), self._predictions_all_positive()
-        ])
+        return self._ok_mae and self._all_positive
 
     @property
     def message(self):
-        if self._model_has_ok_mae:
+        if self._ok_mae:
             mae_message = (
                 f"The model has MAE of {self.model_mae}, which is under the max threshold of {self.max_mae}"
             )
@@ -82,28 +71,20 @@ class SingleModelTest:
                 f"The model has MAE of {self.model_mae}, which is not below the max threshold of {self.max_mae}"
             )
         edge_case_message = (
-            "The model passes all edge cases" if self._predictions_all_positive() else "The model does not pass all edge cases"
+            "The model passes all edge cases" if self._all_positive else "The model does not pass all edge cases"
         )
         return f"{mae_message}. {edge_case_message}."
 
 
 class ChallengerModelTest:
-    def __init__(self, model_challenger, model_current, test_data, target_col):
-        self.model_challenger = model_challenger
-        self.model_current = model_current
-        self.test_data = test_data
-        self.target_col = target_col
-        self.model_challenger_mae = self._calc_model_mae(model_challenger, test_data, target_col)
-        self.model_current_mae = self._calc_model_mae(model_current, test_data, target_col)
-
-    @staticmethod
-    def _calc_model_mae(model, test_data, target_col):
-        predictions = model.predict(test_data)
-        evaluation = RegressionEvaluation(
-            y_true=test_data[target_col],
-            y_pred=predictions
+    def __init__(self, model_challenger_predictions, model_current_predictions, y_true):
+        # Both models are compared at the same precision.
+        self.model_challenger_mae = calc_mae(
+            y_true=y_true, y_pred=np.asarray(model_challenger_predictions, dtype=np.float32)
+        )
+        self.model_current_mae = calc_mae(
+            y_true=y_true, y_pred=np.asarray(model_current_predictions, dtype=np.float32)
         )
-        return evaluation.get_metrics()["mae"]
 
     @property
     def challenger_model_is_better(self) -> bool:
@@ -139,34 +120,44 @@ def main(config):
         name=config['artifacts']['test_data']['name'],
         version="latest"
     )
+    y_test = test_data[config["main"]["target_column"]].to_numpy(dtype=np.float32)
+    X_test = downcast_dtypes(test_data.drop(columns=[config["main"]["target_column"]]))
 
-    logger.info("Loading latest trained model.")
-    loaded_model_challenger = get_model(
+    logger.info("Loading latest trained model and current prod model if it exists.")
+    model_artifact_challenger = get_model_artifact(
+        entity=run.entity,
         project_name=config["main"]["project_name"],
         model_name=config['artifacts']['model']['name'],
         model_version="latest"
     )
-    if "prod" in loaded_model_challenger.wandb_artifact.aliases:
+    if "prod" in model_artifact_challenger.aliases:
         raise ValueError(
             'Latest trained model is already the production model. Something is wrong.'
         )
 
-    logger.info("Loading current prod model if it exists.")
-    try:
-        loaded_model_current = get_model(
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_model_challenger = executor.submit(
+            LoadedModel.from_wandb_artifact, model_artifact_challenger
+        )
+        future_model_current = executor.submit(
+            get_model,
+            entity=run.entity,
             project_name=config["main"]["project_name"],
             model_name=config['artifacts']['model']['name'],
             model_version="prod"
         )
-    except ArtifactDoesNoteExistError:
-        loaded_model_current = None
+        loaded_model_challenger = future_model_challenger.result()
+        try:
+            loaded_model_current = future_model_current.result()
+        except ArtifactDoesNoteExistError:
+            loaded_model_current = None
 
     logger.info("Running single model tests.")
     run.use_artifact(loaded_model_challenger.wandb_artifact)
     single_model_test = SingleModelTest(
         model=loaded_model_challenger.model,
-        test_data=test_data,
-        target_col=config["main"]["target_column"],
+        test_data=X_test,
+        y_true=y_test,
         max_mae=config["main"]["max_mae_to_promote"]
     )
 
@@ -186,10 +177,9 @@ def main(config):
         logger.info("Running model challenger comparison tests.")
         run.use_artifact(loaded_model_current.wandb_artifact)
         challenger_model_test = ChallengerModelTest(
-            model_challenger=loaded_model_challenger.model,
-            model_current=loaded_model_current.model,
-            test_data=test_data,
-            target_col=config["main"]["target_column"],
+            model_challenger_predictions=single_model_test.predictions,
+            model_current_predictions=loaded_model_current.model.predict(X_test),
+            y_true=y_test,
         )
 
         model_to_be_promoted = (
@@ -4,6 +4,7 @@ Module for training and evaluating a model.
 A model configuration that implements the interface found in
 src.models.model_pipeliene_configs.BasePipelineConfig is passed supplied through the Hyrda configuration.
 """
+from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Type
 import logging
@@ -17,7 +18,8 @@ from src.models.evaluation import RegressionEvaluation
 from src.models import model_pipeliene_configs
 from src.models.model_pipeliene_configs import BasePipelineConfig
 from src.utils.artifacts import read_dataframe_artifact, log_dir, log_file
-from src.utils.models import MLFlowModelWrapper, set_seed
+from src.utils.data import downcast_dtypes
+from src.utils.models import MLFlowModelWrapper, save_pipeline_onnx, set_seed
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +42,9 @@ def train_evaluate(
     target_column = config["main"]["target_column"]
 
     logger.info("Load data from training model.")
-    df = read_dataframe_artifact(run, **config["artifacts"]["train_validate_data"])
+    df = downcast_dtypes(read_dataframe_artifact(run, **config["artifacts"]["train_validate_data"]))
+    y = df[target_column].to_numpy(copy=False)
+    X = df.drop(columns=[target_column])
 
     logger.info("Initialize ml pipeline object.")
     pipeline = pipeline_class.get_pipeline(**(config["model"]["params"]))
@@ -48,41 +52,50 @@ def train_evaluate(
     logger.info("predict on hold out data using cross validation.")
     predictions = cross_val_predict(
         estimator=pipeline,
-        X=df,
-        y=df[target_column],
+        X=X,
+        y=y,
         cv=config["evaluation"]["cross_validation_folds"],
-        verbose=3,
+        n_jobs=-1,
+        verbose=0,
     )
 
     model_evaluation = RegressionEvaluation(
-        y_true=df[target_column],
+        y_true=y,
         y_pred=predictions,
     )
 
     logger.info("train on model on all data")
-    pipeline.fit(df, df[target_column])
+    pipeline.fit(X, y)
 
     logger.info("Logging performance metrics.")
-    run.summary.update(model_evaluation.get_metrics())
-
-    wandb.log(model_evaluation.get_metrics())
-
-    logger.info("Logging model evaluation artifacts.")
-    with TemporaryDirectory() as tmpdirname:
-        model_evaluation.save_evaluation_artifacts(out_dir=tmpdirname)
-        pipeline_class.save_fitted_pipeline_plots(pipeline, out_dir=tmpdirname)
-        log_dir(run=run, dir_path=tmpdirname, **config["artifacts"]["evaluation"])
-
-    logger.info("Logging model trained on all data.")
-    with TemporaryDirectory() as tmpdirname:
+    metrics = model_evaluation.get_metrics()
+    run.summary.update(metrics)
+    wandb.log(metrics, commit=True)
+
+    with TemporaryDirectory() as evaluation_dirname, \
+            TemporaryDirectory() as onnx_dirname, \
+            TemporaryDirectory() as model_dirname:
+        logger.info("Logging model evaluation artifacts.")
+        model_evaluation.save_evaluation_artifacts(out_dir=evaluation_dirname)
+        pipeline_class.save_fitted_pipeline_plots(pipeline, out_dir=evaluation_dirname)
+        log_dir(run=run, dir_path=evaluation_dirname, wait=False, **config["artifacts"]["evaluation"])
+
+        logger.info("Logging model trained on all data.")
+        pipeline_onnx_path = str(Path(onnx_dirname) / "pipeline.onnx")
+        save_pipeline_onnx(pipeline, pipeline_onnx_path)
         mlflow.pyfunc.save_model(
-            python_model=MLFlowModelWrapper(pipeline),
-            path=f'{tmpdirname}/model',
+            python_model=MLFlowModelWrapper(columns=pipeline["column_selector"].columns),
+            path=str(Path(model_dirname) / "model"),
+            artifacts={"pipeline_onnx": pipeline_onnx_path},
             conda_env=pipeline_class.get_conda_env(),
             code_path=["src"],
         )
+        log_dir(run=run, dir_path=model_dirname, wait=False, **config["artifacts"]["model"])
 
-        log_dir(run=run, dir_path=tmpdirname, **config["artifacts"]["model"])
+        # The artifacts are uploaded in the background from the temporary directories,
+        # so the run is finished, which waits for the uploads, before they are removed.
+        logger.info("Waiting for artifact uploads to finish.")
+        run.finish()
 
 
 @hydra.main(config_path="../../conf", config_name="config")
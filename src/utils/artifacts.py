@@ -1,5 +1,8 @@
 """Utilities for working with weights and biases artifacts"""
+from functools import lru_cache
 import logging
+import os
+from pathlib import Path
 from tempfile import TemporaryDirectory
 from typing import Optional
 
@@ -11,8 +14,15 @@ from src.exceptions import ArtifactDoesNoteExistError
 
 logger = logging.getLogger(__name__)
 
+DATAFRAME_CACHE_DIR = Path.home() / ".cache" / "mlops-batch"
 
-def log_file(run, file_path: str, type: str, name: str, description: Optional[str] = "", **kwargs) -> None:
+
+def log_file(
+    run, file_path: str, type: str, name: str, description: Optional[str] = "", wait: bool = True, **kwargs
+) -> None:
+    """Log a file as a wandb artifact.
+    If wait is False, the upload continues in the background and is completed when the run finishes.
+    """
     _ = kwargs
     artifact = wandb.Artifact(
         type=type,
@@ -24,10 +34,16 @@ def log_file(run, file_path: str, type: str, name: str, description: Optional[st
     logger.info(f"Logging artifact file {name}")
     run.log_artifact(artifact)
 
-    artifact.wait()
+    if wait:
+        artifact.wait()
 
 
-def log_dir(run, dir_path: str, type: str, name: str, description: Optional[str] = "", **kwargs) -> None:
+def log_dir(
+    run, dir_path: str, type: str, name: str, description: Optional[str] = "", wait: bool = True, **kwargs
+) -> None:
+    """Log a dir as a wandb artifact.
+    If wait is False, the upload continues in the background and is completed when the run finishes.
+    """
     _ = kwargs
     artifact = wandb.Artifact(
         type=type,
@@ -39,32 +55,84 @@ def log_dir(run, dir_path: str, type: str, name: str, description: Optional[str]
     logger.info(f"Logging artifact directory {name}")
     run.log_artifact(artifact)
 
+    if wait:
+        artifact.wait()
+
+
+def log_text(
+    run, text: str, file_name: str, type: str, name: str, description: Optional[str] = "", **kwargs
+) -> None:
+    """Log text as a file in a wandb artifact, without writing it to a file first."""
+    _ = kwargs
+    artifact = wandb.Artifact(
+        type=type,
+        description=description,
+        name=name,
+    )
+    with artifact.new_file(file_name, mode="w") as file:
+        file.write(text)
+
+    logger.info(f"Logging artifact file {name}")
+    run.log_artifact(artifact)
+
     artifact.wait()
 
 
 def log_dataframe(run, df: pd.DataFrame, type: str, name: str, description: Optional[str] = "", **kwargs) -> None:
     _ = kwargs
     with TemporaryDirectory() as tmpdirname:
-        file_name = tmpdirname + "artifacts.parquet"
-        df.to_parquet(file_name)
+        file_name = str(Path(tmpdirname) / "artifacts.parquet")
+        df.to_parquet(file_name, engine="pyarrow", compression="snappy")
         log_file(run, file_name, type, name, description)
 
 
 def read_dataframe_artifact(run, name: str, version: str, **kwargs) -> pd.DataFrame:
     artifact_tag = f"{name}:{version}"
     _ = kwargs
-    logger.info(f"Downloading artifact {artifact_tag}")
     try:
         artifact = run.use_artifact(artifact_tag)
     except wandb.errors.CommError as e:
-        ArtifactDoesNoteExistError(f"Data version does not exist. From WANDB: {e}")
-    artifact_path = artifact.file()
-    return pd.read_parquet(artifact_path)
+        raise ArtifactDoesNoteExistError(f"Data version does not exist. From WANDB: {e}")
 
+    # The digest changes with the artifact content, so a cached file is never stale.
+    cache_dir = DATAFRAME_CACHE_DIR / run.entity / run.project / name
+    cached_path = cache_dir / f"{artifact.digest}.parquet"
+    try:
+        df = pd.read_parquet(cached_path, engine="pyarrow")
+        logger.info(f"Read artifact {artifact_tag} from local cache")
+        return df
+    except FileNotFoundError:
+        # Not cached yet, or evicted by another process.
+        pass
 
-def get_model_artifact(project_name: str, model_name: str, model_version: str):
-    api = wandb.Api()
+    logger.info(f"Downloading artifact {artifact_tag}")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Download next to the cache and move the file into place, so an interrupted
+    # download never leaves a truncated file in the cache.
+    with TemporaryDirectory(dir=cache_dir) as tmpdirname:
+        downloaded_path = artifact.file(root=tmpdirname)
+        df = pd.read_parquet(downloaded_path, engine="pyarrow")
+        os.replace(downloaded_path, cached_path)
+
+    # Only the most recently downloaded version of each artifact is kept.
+    # Eviction is best effort, as other processes may use the same cache.
+    for stale_path in cache_dir.glob("*.parquet"):
+        if stale_path != cached_path:
+            try:
+                stale_path.unlink()
+            except OSError:
+                pass
+    return df
+
+
+@lru_cache(maxsize=None)
+def get_api() -> wandb.Api:
+    """Get a wandb public API client, that is shared within the process."""
+    return wandb.Api(timeout=30)
+
+
+def get_model_artifact(entity: str, project_name: str, model_name: str, model_version: str):
     try:
-        return api.artifact(f"{project_name}/{model_name}:{model_version}")
+        return get_api().artifact(f"{entity}/{project_name}/{model_name}:{model_version}")
     except wandb.errors.CommError as e:
         raise ArtifactDoesNoteExistError(f"Trained model version does not exist. From WANDB: {e}")
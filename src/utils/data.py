@@ -0,0 +1,10 @@
+"""Utilities for working with pandas dataframes."""
+import pandas as pd
+
+
+def downcast_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast float64 columns to float32 and object columns to category."""
+    df = df.astype({c: "float32" for c in df.select_dtypes("float64").columns})
+    for c in df.select_dtypes("object").columns:
+        df[c] = df[c].astype("category")
+    return df
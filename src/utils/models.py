@@ -5,18 +5,34 @@ import numpy as np
 import wandb
 import mlflow
 
-from src.exceptions import ArtifactDoesNoteExistError
+from src.utils.artifacts import get_model_artifact
 
 
 class MLFlowModelWrapper(mlflow.pyfunc.PythonModel):
     """Wrapper class for creating a MLFlow pyfunc from a fitted model,
-     with a predict method
+     with a predict method.
+     If the MLFlow model has a `pipeline_onnx` artifact, saved with `save_pipeline_onnx`,
+     the pipeline is run with ONNX Runtime on the feature columns passed to the constructor.
+     Otherwise the model passed to the constructor is used.
      """
-    def __init__(self, model):
+    def __init__(self, model=None, columns=None):
         self.model = model
+        self.columns = columns
+
+    def load_context(self, context):
+        self.session = None
+        if "pipeline_onnx" in context.artifacts:
+            import onnxruntime
+            self.session = onnxruntime.InferenceSession(
+                context.artifacts["pipeline_onnx"], providers=["CPUExecutionProvider"]
+            )
 
     def predict(self, context, model_input):
-        return self.model.predict(model_input)
+        if self.session is None:
+            return self.model.predict(model_input)
+        features = model_input[self.columns].to_numpy(dtype=np.float32)
+        input_name = self.session.get_inputs()[0].name
+        return self.session.run(None, {input_name: features})[0].ravel()
 
 
 @dataclass
@@ -57,16 +73,29 @@ class LoadedModel:
         self.wandb_artifact.save()
 
 
-def get_model(project_name: str, model_name: str, model_version: str) -> LoadedModel:
-    api = wandb.Api()
-    try:
-        model_artifact = api.artifact(f"{project_name}/{model_name}:{model_version}")
-    except wandb.errors.CommError as e:
-        raise ArtifactDoesNoteExistError(f"Trained model version does not exist. From WANDB: {e}")
-
+def get_model(entity: str, project_name: str, model_name: str, model_version: str) -> LoadedModel:
+    model_artifact = get_model_artifact(entity, project_name, model_name, model_version)
     return LoadedModel.from_wandb_artifact(model_artifact)
 
 
+def save_pipeline_onnx(pipeline, file_path: str) -> None:
+    """Save the steps after the `column_selector` step of a fitted pipeline to file_path in ONNX format.
+    The ONNX model takes the selected columns, in the order of `column_selector.columns`, as float input.
+    """
+    # skl2onnx is only needed to train, not to load the model.
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    if pipeline.steps[0][0] != "column_selector":
+        raise ValueError("The first step of the pipeline must be a `column_selector` step.")
+    n_features = len(pipeline["column_selector"].columns)
+    onnx_model = convert_sklearn(
+        pipeline[1:], initial_types=[("input", FloatTensorType([None, n_features]))]
+    )
+    with open(file_path, "wb") as f:
+        f.write(onnx_model.SerializeToString())
+
+
 def set_seed(seed=33):
     np.random.seed(seed)
     return seed